@@ -0,0 +1,50 @@
+import json
+from db_writer import connect
+
+CHANGES_SQL = """SELECT `seq`, `mod_id`, `kind`, `version`, `operation`, `changed_fields`, `created_at`
+    FROM mod_changes WHERE `seq` > %s ORDER BY `seq` LIMIT %s"""
+
+
+def changes_since(cursor=0, batch_size=500, mydb=None):
+    """Yield batches of change rows with a ``seq`` greater than ``cursor``, oldest first.
+
+    Each row is a dict; ``changed_fields`` maps column names to their new values.
+    Store ``batch[-1]["seq"]`` after handling a batch and pass it back as the
+    cursor next time to resume where you left off. Stops once the feed is drained.
+    A connection passed as ``mydb`` should have autocommit enabled.
+
+    Every seq is reserved under a row lock that is held until its transaction
+    commits, so changes become visible in seq order and a cursor never skips
+    a change that commits later.
+    """
+    own_connection = mydb is None
+    if own_connection:
+        mydb = connect()
+        # Without autocommit every SELECT would read the snapshot taken by the first one
+        mydb.autocommit = True
+    mycursor = mydb.cursor(dictionary=True)
+
+    try:
+        while True:
+            mycursor.execute(CHANGES_SQL, (cursor, batch_size))
+            batch = mycursor.fetchall()
+            if not batch:
+                return
+
+            for row in batch:
+                row["changed_fields"] = json.loads(row["changed_fields"])
+            yield batch
+
+            cursor = batch[-1]["seq"]
+            if len(batch) < batch_size:
+                return
+    finally:
+        mycursor.close()
+        if own_connection:
+            mydb.close()
+
+
+if __name__ == "__main__":
+    for batch in changes_since():
+        for change in batch:
+            print(f"[{change['seq']}] {change['operation']} {change['kind']} {change['mod_id']} {change['version'] or ''}: {change['changed_fields']}")
@@ -0,0 +1,277 @@
+import json
+import math
+import os
+import queue
+import threading
+import time
+import mysql.connector
+from dotenv import load_dotenv
+
+MOD_COLUMNS = (
+    "id", "title", "icon", "author", "author_link", "description", "tags",
+    "mod_link", "download_link", "rating", "reviews", "downloads", "last_updated"
+)
+
+VERSION_COLUMNS = ("mod_id", "version", "state", "release_date", "downloads", "download_url")
+
+
+def upsert_sql(table, columns, keys):
+    return "INSERT INTO {} ({}) VALUES ({}) ON DUPLICATE KEY UPDATE {}".format(
+        table,
+        ", ".join(f"`{column}`" for column in columns),
+        ", ".join(["%s"] * len(columns)),
+        ", ".join(f"`{column}` = VALUES(`{column}`)" for column in columns if column not in keys)
+    )
+
+
+MOD_SQL = upsert_sql("mods", MOD_COLUMNS, ("id",))
+VERSION_SQL = upsert_sql("mod_versions", VERSION_COLUMNS, ("mod_id", "version"))
+
+CHANGE_SQL = "INSERT INTO mod_changes (`seq`, `mod_id`, `kind`, `version`, `operation`, `changed_fields`) VALUES (%s, %s, %s, %s, %s, %s)"
+
+# Reserves seq numbers by bumping the single counter row, whose lock is then held until commit
+RESERVE_SEQ_SQL = "UPDATE mod_changes_seq SET `seq` = LAST_INSERT_ID(`seq` + %s) WHERE `id` = 1"
+
+SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS mod_versions (
+        `mod_id` INT NOT NULL,
+        `version` VARCHAR(255) NOT NULL,
+        `state` VARCHAR(64),
+        `release_date` VARCHAR(64),
+        `downloads` INT,
+        `download_url` TEXT,
+        PRIMARY KEY (`mod_id`, `version`)
+    )""",
+    """CREATE TABLE IF NOT EXISTS mod_changes (
+        `seq` BIGINT UNSIGNED NOT NULL PRIMARY KEY,
+        `mod_id` INT NOT NULL,
+        `kind` ENUM('mod', 'version') NOT NULL,
+        `version` VARCHAR(255),
+        `operation` ENUM('insert', 'update') NOT NULL,
+        `changed_fields` JSON NOT NULL,
+        `created_at` TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        INDEX (`mod_id`)
+    )""",
+    """CREATE TABLE IF NOT EXISTS mod_changes_seq (
+        `id` TINYINT UNSIGNED NOT NULL PRIMARY KEY,
+        `seq` BIGINT UNSIGNED NOT NULL
+    )""",
+    "INSERT IGNORE INTO mod_changes_seq (`id`, `seq`) VALUES (1, 0)",
+)
+
+# Marks the end of the queue so the writer thread knows to drain and exit
+_STOP = object()
+
+
+def connect():
+    load_dotenv()
+    return mysql.connector.connect(
+        host=os.environ["DB_HOST"],
+        user=os.environ["DB_USER"],
+        password=os.environ["DB_PASSWORD"],
+        database="beamng"
+    )
+
+
+def create_schema(mydb):
+    """Create the version and change feed tables if they don't exist yet."""
+    mycursor = mydb.cursor()
+    try:
+        for statement in SCHEMA:
+            mycursor.execute(statement)
+    finally:
+        mycursor.close()
+
+
+def same_value(stored, new):
+    """Compare a stored column with a scraped value, ignoring int/float/Decimal differences."""
+    if stored is None or new is None:
+        return stored is new
+    if isinstance(stored, float) or isinstance(new, float):
+        # A FLOAT column hands back 4.699999809265137 for 4.7, single precision is good to about 7 digits
+        try:
+            return math.isclose(float(stored), float(new), rel_tol=1e-6)
+        except (TypeError, ValueError):
+            return False
+    if isinstance(stored, (str, bytes)) or isinstance(new, (str, bytes)):
+        return str(stored) == str(new)
+    # int and Decimal compare exactly, so a download count going up by one is never missed
+    return stored == new
+
+
+def diff_row(stored, row, columns):
+    """Return the changed columns of ``row`` as a dict, every column when nothing is stored yet."""
+    if stored is None:
+        return {column: row[column] for column in columns}
+    return {column: row[column] for column in columns if not same_value(stored.get(column), row[column])}
+
+
+class DatabaseWriter:
+    """Persists scraped rows from a dedicated thread so the event loop never waits on MySQL.
+
+    Rows are buffered and written with ``executemany`` once ``batch_size`` rows
+    are pending or ``flush_interval`` seconds have passed since the first one.
+    Every insert or changed row also appends to ``mod_changes`` in the same
+    transaction, so the change feed never disagrees with the tables it describes.
+    Change seq numbers come from the locked ``mod_changes_seq`` counter, so
+    writers in different processes commit their changes in seq order.
+    """
+
+    def __init__(self, batch_size=50, flush_interval=2.0):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+        self._error = None
+        self._mydb = None
+
+    def start(self):
+        """Connect and create the tables, raising here if either fails, then start the writer thread."""
+        self._mydb = connect()
+        try:
+            create_schema(self._mydb)
+        except mysql.connector.Error:
+            self._mydb.close()
+            raise
+
+        # The connection is only used by the writer thread from here on
+        self._thread.start()
+        return self
+
+    def submit_mod(self, mod):
+        """Queue a mod row (dict keyed by MOD_COLUMNS). Never blocks the caller.
+
+        Only ``id`` is required, columns left out keep their stored value.
+        """
+        self._check()
+        self._queue.put_nowait(("mod", {column: mod[column] for column in MOD_COLUMNS if column in mod}))
+
+    def submit_version(self, version):
+        """Queue a version row (dict keyed by VERSION_COLUMNS). Never blocks the caller."""
+        self._check()
+        self._queue.put_nowait(("version", {column: version[column] for column in VERSION_COLUMNS}))
+
+    def close(self):
+        """Flush everything still queued and wait for the writer thread to finish."""
+        if self._thread.is_alive():
+            self._queue.put_nowait(_STOP)
+            self._thread.join()
+        self._check()
+
+    def _check(self):
+        # Surface a crash of the writer thread instead of queueing rows nobody will write
+        if self._error is not None:
+            raise RuntimeError("database writer thread failed") from self._error
+
+    def _run(self):
+        try:
+            self._write_loop(self._mydb)
+        except Exception as e:
+            self._error = e
+            print(f"[DB] Writer thread failed: {e}")
+        finally:
+            self._mydb.close()
+
+    def _write_loop(self, mydb):
+        mycursor = mydb.cursor(dictionary=True)
+        batch = []
+        deadline = None
+        stopping = False
+
+        try:
+            while not stopping:
+                timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    item = None
+
+                if item is _STOP:
+                    stopping = True
+                elif item is not None:
+                    batch.append(item)
+                    if deadline is None:
+                        deadline = time.monotonic() + self.flush_interval
+
+                if batch and (stopping or len(batch) >= self.batch_size or time.monotonic() >= deadline):
+                    self._flush(mydb, mycursor, batch)
+                    batch = []
+                    deadline = None
+        finally:
+            mycursor.close()
+
+    def _flush(self, mydb, mycursor, batch):
+        try:
+            self._write(mycursor, batch)
+            mydb.commit()
+            print(f"[DB] Wrote {len(batch)} rows")
+        except mysql.connector.Error as e:
+            mydb.rollback()
+            print(f"[DB] Batch insert failed ({e}), retrying rows one by one")
+
+            # Fall back to single rows so one bad mod does not drop the whole batch
+            for item in batch:
+                try:
+                    self._write(mycursor, [item])
+                    mydb.commit()
+                except mysql.connector.Error as e:
+                    mydb.rollback()
+                    print(f"Failed to insert {item[0]} {item[1]['id' if item[0] == 'mod' else 'mod_id']}: {e}")
+
+    def _write(self, mycursor, batch):
+        mods = [row for kind, row in batch if kind == "mod"]
+        versions = [row for kind, row in batch if kind == "version"]
+        changes = []
+
+        if mods:
+            mod_ids = {row["id"] for row in mods}
+            mycursor.execute(
+                "SELECT * FROM mods WHERE id IN ({}) FOR UPDATE".format(", ".join(["%s"] * len(mod_ids))),
+                tuple(mod_ids)
+            )
+            stored = {row["id"]: row for row in mycursor.fetchall()}
+
+            merged = {}
+            for row in mods:
+                changed = diff_row(stored.get(row["id"]), row, [column for column in row if column != "id"])
+                if changed:
+                    operation = "update" if row["id"] in stored else "insert"
+                    changes.append((row["id"], "mod", None, operation, json.dumps(changed, default=str)))
+                # Later rows for the same mod in this batch diff against this one
+                stored[row["id"]] = {**stored.get(row["id"], {}), **row}
+                merged[row["id"]] = {**merged.get(row["id"], {}), **row}
+
+            # Partial rows only update the columns they carry, so upsert each column set separately
+            by_columns = {}
+            for row in merged.values():
+                by_columns.setdefault(tuple(column for column in MOD_COLUMNS if column in row), []).append(row)
+            for columns, rows in by_columns.items():
+                if columns == ("id",):
+                    continue
+                sql = MOD_SQL if columns == MOD_COLUMNS else upsert_sql("mods", columns, ("id",))
+                mycursor.executemany(sql, [tuple(row[column] for column in columns) for row in rows])
+
+        if versions:
+            mod_ids = {row["mod_id"] for row in versions}
+            mycursor.execute(
+                "SELECT * FROM mod_versions WHERE mod_id IN ({}) FOR UPDATE".format(", ".join(["%s"] * len(mod_ids))),
+                tuple(mod_ids)
+            )
+            stored = {(row["mod_id"], row["version"]): row for row in mycursor.fetchall()}
+
+            for row in versions:
+                key = (row["mod_id"], row["version"])
+                changed = diff_row(stored.get(key), row, VERSION_COLUMNS[2:])
+                if changed:
+                    operation = "update" if key in stored else "insert"
+                    changes.append((row["mod_id"], "version", row["version"], operation, json.dumps(changed, default=str)))
+                stored[key] = row
+
+            mycursor.executemany(VERSION_SQL, [tuple(row[column] for column in VERSION_COLUMNS) for row in versions])
+
+        if changes:
+            # Taken last so the counter lock is held only for the rest of this transaction
+            mycursor.execute(RESERVE_SEQ_SQL, (len(changes),))
+            mycursor.execute("SELECT LAST_INSERT_ID() AS seq")
+            first = mycursor.fetchone()["seq"] - len(changes) + 1
+            mycursor.executemany(CHANGE_SQL, [(first + i,) + change for i, change in enumerate(changes)])
@@ -2,20 +2,10 @@ import asyncio
 import aiohttp
 from bs4 import BeautifulSoup
 from functools import lru_cache
-import mysql.connector
-import os
-from dotenv import load_dotenv
+from db_writer import DatabaseWriter
 
-# Init MySQL client
-load_dotenv()
-mydb = mysql.connector.connect(
-    host=os.environ["DB_HOST"],
-    user=os.environ["DB_USER"],
-    password=os.environ["DB_PASSWORD"],
-    database="beamng"
-)
-
-mycursor = mydb.cursor()
+# MySQL writes happen on the writer thread so they never stall in-flight requests
+writer = DatabaseWriter()
 
 # Async function to fetch a page
 async def fetch_page(session, url):
@@ -232,49 +222,27 @@ async def frontpages(query):
             print(f"    - Last Updated: {last_updated_a}\n")
 
             try:
-                sql = """INSERT INTO mods (`id`, `title`, `icon`, `author`, `author_link`, `description`, 
-                    `tags`, `mod_link`, `download_link`, `rating`, `reviews`, `downloads`, `last_updated`) 
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s) ON DUPLICATE KEY UPDATE 
-                    `title` = %s, `icon` = %s, `author` = %s, `author_link` = %s, 
-                    `description` = %s, `tags` = %s, `mod_link` = %s, `download_link` = %s, 
-                    `rating` = %s, `reviews` = %s, `downloads` = %s, `last_updated` = %s""".replace("\n", "")
-                
-                val = (
-                    int(mod_page_link.split(".")[len(mod_page_link.split(".")) - 1].replace("/", "")), 
-
-                    # Initial values
-                    title, 
-                    f"https://www.beamng.com/{icon_src}",
-                    author_name,
-                    author_link,
-                    description,
-                    prefix_text,
-                    f"https://www.beamng.com/{mod_page_link}",
-                    download_link,
-                    float(rating.replace(",", "")),
-                    int(number_of_ratings.replace(",", "").replace(" ratings", "").replace(" rating", "")),
-                    int(downloads.replace(",", "")),
-                    last_updated_a,
-                    
-                    # Update values
-                    title, 
-                    f"https://www.beamng.com/{icon_src}",
-                    author_name,
-                    author_link,
-                    description,
-                    prefix_text,
-                    f"https://www.beamng.com/{mod_page_link}",
-                    download_link,
-                    float(rating.replace(",", "")),
-                    int(number_of_ratings.replace(",", "").replace(" ratings", "").replace(" rating", "")),
-                    int(downloads.replace(",", "")),
-                    last_updated_a,
-                )
-
-                mycursor.execute(sql, val)
-                mydb.commit()
+                mod = {
+                    "id": int(mod_page_link.split(".")[len(mod_page_link.split(".")) - 1].replace("/", "")),
+                    "title": title,
+                    "icon": f"https://www.beamng.com/{icon_src}",
+                    "author": author_name,
+                    "author_link": author_link,
+                    "description": description,
+                    "tags": prefix_text,
+                    "mod_link": f"https://www.beamng.com/{mod_page_link}",
+                    "download_link": download_link,
+                    "rating": float(rating.replace(",", "")),
+                    "reviews": int(number_of_ratings.replace(",", "").replace(" ratings", "").replace(" rating", "")),
+                    "downloads": int(downloads.replace(",", "")),
+                    "last_updated": last_updated_a,
+                }
             except:
-                print("Failed to insert")
+                print(f"Failed to parse mod stats for https://www.beamng.com/{mod_page_link}, skipping insert")
+                continue
+
+            # Outside the try so a failed writer thread stops the run instead of being swallowed
+            writer.submit_mod(mod)
 
 # Run the async loop
 async def main():
@@ -286,7 +254,12 @@ async def main():
     DOWNLOADS_PAGE = f"https://www.beamng.com/resources/?page={PAGE_NUMBER}&order=download_count"
     TITLE_PAGE = f"https://www.beamng.com/resources/?page={PAGE_NUMBER}&order=title"
     
-    await frontpages(LAST_UPDATED_PAGE)
+    writer.start()
+    try:
+        await frontpages(LAST_UPDATED_PAGE)
+    finally:
+        # Drain the queue off the event loop before exiting
+        await asyncio.to_thread(writer.close)
 
 # Start scraping
 results = asyncio.run(main())
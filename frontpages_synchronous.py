@@ -1,11 +1,14 @@
 import requests
 from bs4 import BeautifulSoup
 from functools import lru_cache
+import transport
 
 # Function to fetch a page
 def fetch_page(url):
-    headers = {"User-Agent": "Mozilla/5.0"}
-    response = requests.get(url, headers=headers)
+    try:
+        response = transport.get(url)
+    except requests.RequestException:
+        return None
     return response.text if response.status_code == 200 else None
 
 # Function to get download links from the mod page
@@ -13,8 +16,9 @@ def fetch_page(url):
 def get_download_link_from_mod_page(url: str):
     html = fetch_page(url)
     if not html:
-        return None
-    
+        # Raise rather than return so lru_cache does not remember the failure
+        raise requests.RequestException(f"Failed to fetch mod page {url}")
+
     soup = BeautifulSoup(html, 'html.parser')
     primary_links = soup.find_all("ul", class_="primaryLinks")
 
@@ -36,7 +40,8 @@ def extract_versions(url):
     versions = []
     html = fetch_page(url)
     if not html:
-        return versions  # Return empty list if the page doesn't load
+        # Raise rather than return so lru_cache does not remember the failure
+        raise requests.RequestException(f"Failed to fetch history page {url}")
 
     soup = BeautifulSoup(html, 'html.parser')
     table = soup.find("table", class_="dataTable resourceHistory")
@@ -70,8 +75,16 @@ def extract_versions(url):
     return versions
 
 
-# Function for scraping the resources page
-def frontpages(query):
+# Function to find the title link of a listing post, the first one that isn't a tag prefix
+def mod_page_tag_from_post(post):
+    title_container = post.find("h3", class_="title")
+    if not title_container:
+        return None
+    return next((tag for tag in title_container.find_all("a") if "prefixLink" not in tag.get("class", [])), None)
+
+
+# Function for scraping the resources page, fetch_details=False skips the mod and history pages
+def frontpages(query, fetch_details=True):
     results = []
     html = fetch_page(query)
     if not html:
@@ -80,6 +93,15 @@ def frontpages(query):
     soup = BeautifulSoup(html, 'html.parser')
     posts = soup.find_all("li", class_="resourceListItem visible")
 
+    # Fetch every mod and history page of this listing concurrently, the loop below then hits the caches
+    prefetch = []
+    for post in posts if fetch_details else []:
+        mod_page_tag = mod_page_tag_from_post(post)
+        if mod_page_tag and mod_page_tag.get("href"):
+            prefetch.append((get_download_link_from_mod_page, f"https://www.beamng.com/{mod_page_tag['href']}"))
+            prefetch.append((extract_versions, f"https://www.beamng.com/{mod_page_tag['href']}/historyImproved"))
+    transport.prefetch(prefetch)
+
     for post in posts:
         # Get Icon and Avatar
         icons_container = post.find("div", class_="listBlockInner")
@@ -109,18 +131,21 @@ def frontpages(query):
             if prefix_tag:
                 prefix_text = prefix_tag.get_text(strip=True)
 
-            mod_page_tag = next((tag for tag in title_tags if "prefixLink" not in tag.get("class", [])), None)
+            mod_page_tag = mod_page_tag_from_post(post)
             if mod_page_tag:
                 title = mod_page_tag.get_text(strip=True)
-                mod_page_link = mod_page_tag["href"]
-                if mod_page_link:
-                    download_link = get_download_link_from_mod_page(f"https://www.beamng.com/{mod_page_link}")
+                mod_page_link = mod_page_tag.get("href")
+                if mod_page_link and fetch_details:
+                    try:
+                        download_link = get_download_link_from_mod_page(f"https://www.beamng.com/{mod_page_link}")
+                    except requests.RequestException as e:
+                        print(f"[ERROR] {e}")
 
         # Get mod author
         author_name, author_link = None, None
         metadata_container = post.find("div", class_="resourceDetails muted")
         if metadata_container:
-            author_tag = soup.find("a", href=lambda href: href and "resources/authors/" in href)
+            author_tag = post.find("a", href=lambda href: href and "resources/authors/" in href)
             if author_tag:
                 author_name = author_tag.get_text(strip=True)
                 author_link = author_tag["href"]
@@ -164,6 +189,13 @@ def frontpages(query):
                     if last_updated_tag:
                         last_updated_a = last_updated_tag.get_text(strip=True)
 
+        version_downloads = []
+        if mod_page_link and fetch_details:
+            try:
+                version_downloads = extract_versions(f"https://www.beamng.com/{mod_page_link}/historyImproved")
+            except requests.RequestException as e:
+                print(f"[ERROR] {e}")
+
         scrapables = {
             "title": title,
             "avatar": f"https://www.beamng.com/{avatar_src}" if avatar_src else None,
@@ -179,7 +211,7 @@ def frontpages(query):
             "downloads": downloads,
             "subscriptions": subscriptions,
             "last_updated": last_updated_a,
-            "version_downloads": extract_versions(f"https://www.beamng.com/{mod_page_link}/historyImproved") if mod_page_link else []
+            "version_downloads": version_downloads
         }
 
         results.append(scrapables)
@@ -200,7 +232,7 @@ def frontpages(query):
         print(f"Last Updated: {last_updated_a}" if last_updated_a else "Last Updated: N/A")
 
         print("Version Downloads:")
-        version_data = extract_versions(f"https://www.beamng.com/{mod_page_link}/historyImproved") if mod_page_link else []
+        version_data = scrapables["version_downloads"]
         for version in version_data:
             print(f"    - Version: {version['version']}")
             print(f"      State: {version['state']}")
@@ -220,27 +252,28 @@ def main():
     return results
 
 # Run the scraper
-results = main()
-for result in results:
-    print(f"\nTitle: {result['title']}")
-    print(f"Avatar: {result['avatar']}")
-    print(f"Icon: {result['icon']}")
-    print(f"Author: {result['author']}")
-    print(f"Author Link: {result['author_link']}")
-    print(f"Description: {result['description']}")
-    print(f"Tags: {result['tags']}")
-    print(f"Mod Page Link: {result['mod_link']}")
-    print(f"Download Link: {result['download_link']}")
-    print(f"Stars: {result['stars']}")
-    print(f"Number of Ratings: {result['ratings']}")
-    print(f"Number of Downloads: {result['downloads']}")
-    print(f"Number of Subscriptions: {result['subscriptions']}")
-    print(f"Last Updated: {result['last_updated']}")
-    
-    print("Version Downloads:")
-    for version in result["version_downloads"]:
-        print(f"    - Version: {version['version']}")
-        print(f"      State: {version['state']}")
-        print(f"      Release Date: {version['release_date']}")
-        print(f"      Downloads: {version['downloads']}")
-        print(f"      Download URL: {version['download_url']}")
+if __name__ == "__main__":
+    results = main()
+    for result in results:
+        print(f"\nTitle: {result['title']}")
+        print(f"Avatar: {result['avatar']}")
+        print(f"Icon: {result['icon']}")
+        print(f"Author: {result['author']}")
+        print(f"Author Link: {result['author_link']}")
+        print(f"Description: {result['description']}")
+        print(f"Tags: {result['tags']}")
+        print(f"Mod Page Link: {result['mod_link']}")
+        print(f"Download Link: {result['download_link']}")
+        print(f"Stars: {result['stars']}")
+        print(f"Number of Ratings: {result['ratings']}")
+        print(f"Number of Downloads: {result['downloads']}")
+        print(f"Number of Subscriptions: {result['subscriptions']}")
+        print(f"Last Updated: {result['last_updated']}")
+
+        print("Version Downloads:")
+        for version in result["version_downloads"]:
+            print(f"    - Version: {version['version']}")
+            print(f"      State: {version['state']}")
+            print(f"      Release Date: {version['release_date']}")
+            print(f"      Downloads: {version['downloads']}")
+            print(f"      Download URL: {version['download_url']}")
@@ -0,0 +1,329 @@
+import heapq
+import json
+import math
+import os
+import time
+import requests
+from dotenv import load_dotenv
+import frontpages_synchronous as scraper
+import transport
+from db_writer import DatabaseWriter, connect
+
+load_dotenv()
+STATE_FILE = os.environ.get("SCHEDULER_STATE_FILE", "refresh_state.json")
+
+# Mod and history page requests spent per cycle, listing pages are not counted
+REQUEST_BUDGET = int(os.environ.get("SCHEDULER_REQUEST_BUDGET", 100))
+REQUESTS_PER_MOD = 2
+
+# No mod goes longer than this without its mod and history pages being refetched
+MAX_STALENESS = float(os.environ.get("SCHEDULER_MAX_STALENESS_HOURS", 168)) * 3600
+
+# Time for an old download rate sample, and the boost from a new version, to lose half their weight
+RATE_HALF_LIFE = 24 * 3600
+RECENCY_HALF_LIFE = 72 * 3600
+RECENCY_WEIGHT = 3.0
+
+# A mod whose pages fail to load waits this long before its next attempt, doubling per failure up to MAX_STALENESS
+RETRY_BACKOFF = 3600
+
+# Listing pages are cheap (about 20 mods each) and feed the change signals for every cycle
+LISTING_PAGES = [
+    "https://www.beamng.com/resources/?page=1",
+    "https://www.beamng.com/resources/?page=2",
+    "https://www.beamng.com/resources/?page=1&order=download_count",
+    "https://www.beamng.com/resources/?page=2&order=download_count",
+]
+
+# Tiers are compared before scores: overdue mods first, then new or changed ones, then by score
+OVERDUE, PENDING, SCORED = 2, 1, 0
+
+
+def parse_count(value):
+    try:
+        return int(str(value).replace(",", ""))
+    except ValueError:
+        return None
+
+
+def parse_float(value):
+    try:
+        return float(str(value).replace(",", ""))
+    except ValueError:
+        return None
+
+
+def mod_id_from_link(mod_link):
+    return int(mod_link.rstrip("/").split(".")[-1])
+
+
+def mod_row(mod_id, mod):
+    """Convert a listing result from frontpages_synchronous into a mods table row.
+
+    Stats that don't parse are left out so the stored value is kept.
+    """
+    row = {
+        "id": mod_id,
+        "title": mod["title"],
+        "icon": mod["icon"],
+        "author": mod["author"],
+        "author_link": mod["author_link"],
+        "description": mod["description"],
+        "tags": mod["tags"],
+        "mod_link": mod["mod_link"],
+        "rating": parse_float(mod["stars"]),
+        "reviews": parse_count(str(mod["ratings"]).replace(" ratings", "").replace(" rating", "")),
+        "downloads": parse_count(mod["downloads"]),
+        "last_updated": mod["last_updated"],
+    }
+    return {column: value for column, value in row.items() if value is not None or column not in ("rating", "reviews", "downloads")}
+
+
+class RefreshScheduler:
+    """Priority queue of mods ordered by how likely they are to have changed since their last refresh.
+
+    Every mod in the ``mods`` table is tracked, and listing pages are observed
+    every cycle to track download deltas and ``last_updated`` changes; the mod
+    and history pages are only refetched for the mods that win the request
+    budget. A mod's staleness counts from its last refresh, or from when it
+    was first seen if it was never refreshed, and mods past ``max_staleness``
+    always win first. Every mod is therefore refreshed at least that often as
+    long as the budget covers ``len(mods) * REQUESTS_PER_MOD`` requests per
+    staleness window.
+
+    Mods whose pages fail to load are skipped for an exponentially growing
+    backoff, capped at ``max_staleness``, instead of claiming the budget every cycle.
+    """
+
+    def __init__(self, mods=None, max_staleness=MAX_STALENESS):
+        self.mods = mods if mods is not None else {}
+        self.max_staleness = max_staleness
+
+    @classmethod
+    def load(cls, path=STATE_FILE):
+        if not os.path.exists(path):
+            return cls()
+        with open(path) as f:
+            return cls(json.load(f))
+
+    def save(self, path=STATE_FILE):
+        # Write a temp file and swap it in so an interrupted save can't leave a truncated state file
+        with open(f"{path}.tmp", "w") as f:
+            json.dump(self.mods, f, indent=4)
+        os.replace(f"{path}.tmp", path)
+
+    def add(self, mod_id, mod_link, downloads=None, last_updated=None, now=None):
+        """Start tracking a mod, its first refresh is due right away."""
+        now = time.time() if now is None else now
+        self.mods[str(mod_id)] = {
+            "mod_link": mod_link,
+            "downloads": downloads,
+            "last_updated": last_updated,
+            "observed_at": now,
+            "first_seen": now,
+            "download_rate": 0.0,
+            "last_change": None,
+            "last_refresh": None,
+            "latest_version": None,
+            "versions": None,
+            "pending": True,
+            "failures": 0,
+            "last_attempt": None,
+        }
+
+    def observe(self, mod_id, mod_link, downloads, last_updated, now=None):
+        """Record listing page stats for a mod and update its download rate."""
+        now = time.time() if now is None else now
+        entry = self.mods.get(str(mod_id))
+
+        if entry is None:
+            self.add(mod_id, mod_link, downloads, last_updated, now)
+            return
+
+        elapsed = now - entry["observed_at"]
+        if downloads is not None and entry["downloads"] is not None and elapsed > 0:
+            # Exponentially weighted downloads per hour, weighted by how much time the sample covers
+            rate = max(downloads - entry["downloads"], 0) / (elapsed / 3600)
+            alpha = 1 - 0.5 ** (elapsed / RATE_HALF_LIFE)
+            entry["download_rate"] = alpha * rate + (1 - alpha) * entry["download_rate"]
+
+        if last_updated and last_updated != entry["last_updated"]:
+            entry["last_change"] = now
+            entry["pending"] = True
+
+        entry["mod_link"] = mod_link
+        entry["downloads"] = downloads if downloads is not None else entry["downloads"]
+        entry["last_updated"] = last_updated or entry["last_updated"]
+        entry["observed_at"] = now
+
+    def sync(self, tracked, listed_ids, now=None):
+        """Track every (mod_id, mod_link) in ``tracked`` and drop mods found neither there nor in ``listed_ids``."""
+        tracked = {str(mod_id): mod_link for mod_id, mod_link in tracked}
+        keep = set(tracked) | {str(mod_id) for mod_id in listed_ids}
+
+        for mod_id, mod_link in tracked.items():
+            if mod_id not in self.mods:
+                self.add(mod_id, mod_link, now=now)
+
+        dropped = [mod_id for mod_id in self.mods if mod_id not in keep]
+        for mod_id in dropped:
+            del self.mods[mod_id]
+        return dropped
+
+    def record_refresh(self, mod_id, versions, now=None):
+        """Record a completed refresh of a mod's pages and note whether a new version showed up."""
+        now = time.time() if now is None else now
+        entry = self.mods[str(mod_id)]
+        latest_version = versions[0]["version"] if versions else None
+
+        if entry["versions"] is not None and (len(versions) != entry["versions"] or latest_version != entry["latest_version"]):
+            entry["last_change"] = now
+
+        entry["versions"] = len(versions)
+        entry["latest_version"] = latest_version
+        entry["last_refresh"] = now
+        entry["last_attempt"] = now
+        entry["pending"] = False
+        entry["failures"] = 0
+
+    def record_failure(self, mod_id, now=None):
+        """Record a refresh whose pages failed to load, pushing the next attempt back."""
+        now = time.time() if now is None else now
+        entry = self.mods[str(mod_id)]
+        entry["failures"] = entry.get("failures", 0) + 1
+        entry["last_attempt"] = now
+
+    def priority(self, entry, now):
+        """Return a (tier, score) pair, higher sorts first, or None while the mod is backing off."""
+        if entry.get("failures"):
+            backoff = min(RETRY_BACKOFF * 2 ** (entry["failures"] - 1), self.max_staleness)
+            if now - entry["last_attempt"] < backoff:
+                return None
+
+        if entry["last_refresh"] is None:
+            # Never refreshed mods age from when they were first seen, so they can't wait forever
+            staleness = now - entry.get("first_seen", entry["observed_at"])
+        else:
+            staleness = now - entry["last_refresh"]
+
+        if staleness >= self.max_staleness:
+            return OVERDUE, staleness
+        if entry["pending"]:
+            return PENDING, staleness
+
+        # Expected downloads since the last refresh, log scaled so a few huge mods can't starve the rest
+        score = math.log1p(entry["download_rate"] * staleness / 3600)
+        if entry["last_change"] is not None:
+            score += RECENCY_WEIGHT * 0.5 ** ((now - entry["last_change"]) / RECENCY_HALF_LIFE)
+        return SCORED, score
+
+    def next_batch(self, budget=REQUEST_BUDGET, now=None):
+        """Return (mod_id, mod_link) pairs for the mods to refresh with ``budget`` requests."""
+        now = time.time() if now is None else now
+        queue = []
+        for mod_id, entry in self.mods.items():
+            priority = self.priority(entry, now)
+            if priority is not None:
+                heapq.heappush(queue, (-priority[0], -priority[1], mod_id))
+
+        batch = []
+        while queue and len(batch) < budget // REQUESTS_PER_MOD:
+            _, _, mod_id = heapq.heappop(queue)
+            batch.append((int(mod_id), self.mods[mod_id]["mod_link"]))
+        return batch
+
+
+# Function to list every stored mod as (id, mod_link)
+def tracked_mods():
+    mydb = connect()
+    try:
+        mycursor = mydb.cursor()
+        mycursor.execute("SELECT `id`, `mod_link` FROM mods WHERE `mod_link` IS NOT NULL")
+        return mycursor.fetchall()
+    finally:
+        mydb.close()
+
+
+# Run one refresh cycle: observe the listing pages, then spend the budget on the top mods
+def run_cycle(listing_pages=LISTING_PAGES, budget=REQUEST_BUDGET, state_file=STATE_FILE, writer=None, tracked=None):
+    scheduler = RefreshScheduler.load(state_file)
+
+    # Mods rows to write this cycle, keyed by mod id
+    rows = {}
+    for page in listing_pages:
+        for mod in scraper.frontpages(page, fetch_details=False):
+            if mod["mod_link"]:
+                mod_id = mod_id_from_link(mod["mod_link"])
+                scheduler.observe(mod_id, mod["mod_link"], parse_count(mod["downloads"]), mod["last_updated"])
+                rows[mod_id] = mod_row(mod_id, mod)
+
+    # tracked comes from the mods table, so dormant mods that left the listings keep being refreshed
+    if tracked is not None:
+        dropped = scheduler.sync(tracked, rows)
+        if dropped:
+            print(f"[STEP] Stopped tracking {len(dropped)} mods no longer in the mods table")
+
+    batch = scheduler.next_batch(budget)
+    print(f"[STEP] Refreshing {len(batch)} of {len(scheduler.mods)} tracked mods")
+
+    # Use the uncached fetchers and their results directly, a batch can be larger than their lru_caches
+    calls = []
+    for mod_id, mod_link in batch:
+        calls.append((scraper.get_download_link_from_mod_page.__wrapped__, mod_link))
+        calls.append((scraper.extract_versions.__wrapped__, f"{mod_link}/historyImproved"))
+    fetched = transport.fetch_all(calls)
+
+    results = []
+    for index, (mod_id, mod_link) in enumerate(batch):
+        download_link, versions = fetched[2 * index], fetched[2 * index + 1]
+
+        failed = [result for result in (download_link, versions) if isinstance(result, Exception)]
+        for error in failed:
+            if not isinstance(error, requests.RequestException):
+                raise error
+        if failed:
+            print(f"[ERROR] {failed[0]}, backing off mod {mod_id}")
+            scheduler.record_failure(mod_id)
+            continue
+
+        # Every mod has at least one version, an empty history means the page didn't load properly
+        if not versions:
+            print(f"[ERROR] No version history for mod {mod_id}, backing off")
+            scheduler.record_failure(mod_id)
+            continue
+        scheduler.record_refresh(mod_id, versions)
+        rows.setdefault(mod_id, {"id": mod_id})["download_link"] = download_link
+
+        if writer:
+            for version in versions:
+                writer.submit_version({
+                    "mod_id": mod_id,
+                    "version": version["version"],
+                    "state": version["state"],
+                    "release_date": version["release_date"],
+                    "downloads": parse_count(version["downloads"]),
+                    "download_url": version["download_url"],
+                })
+
+        results.append({
+            "id": mod_id,
+            "mod_link": mod_link,
+            "download_link": download_link,
+            "version_downloads": versions,
+        })
+
+    if writer:
+        for row in rows.values():
+            writer.submit_mod(row)
+
+    scheduler.save(state_file)
+    return results
+
+
+if __name__ == "__main__":
+    writer = DatabaseWriter().start()
+    try:
+        results = run_cycle(writer=writer, tracked=tracked_mods())
+    finally:
+        writer.close()
+    print(f"[RESULTS] Refreshed {len(results)} mods")
@@ -3,13 +3,13 @@ from bs4 import BeautifulSoup
 from functools import lru_cache
 from urllib.parse import urlparse, urlunparse, parse_qs
 import json
+import transport
 
 # Function to fetch a page synchronously
 def fetch_page(url):
-    headers = {"User-Agent": "Mozilla/5.0"}
     try:
         print(f"[STEP] Fetching page: {url}")
-        response = requests.get(url, headers=headers)
+        response = transport.get(url)
         response.raise_for_status()
         html = response.text
         print(f"[SUCCESS] Fetched page: {url}")
@@ -24,8 +24,8 @@ def get_metadata_from_mod_page(url: str):
     print(f"[STEP] Fetching metadata from mod page: {url}")
     html = fetch_page(url)
     if not html:
-        print(f"[ERROR] Skipping metadata fetch for {url} due to failed page fetch.")
-        return "N/A", "N/A", "N/A", "N/A", "N/A"  # Return default values if page fetch failed
+        # Raise rather than return defaults so lru_cache does not remember the failure
+        raise requests.RequestException(f"Failed to fetch mod page {url}")
 
     soup = BeautifulSoup(html, 'html.parser')
     print(f"[SUCCESS] Parsed HTML for metadata on: {url}")
@@ -76,6 +76,20 @@ def get_metadata_from_mod_page(url: str):
 
     return download_link, number_of_downloads, rating, number_of_ratings, last_update
 
+# Function to get a search result's mod page link, without the ?update= query that points at a single update
+def mod_link_from_post(post):
+    post_header_tag = post.find("h3", class_="title")
+    title_tag = post_header_tag.find("a") if post_header_tag else None
+    if not title_tag or not title_tag.get("href"):
+        return None
+
+    mod_link = f"https://www.beamng.com/{title_tag['href']}"
+    parsed_url = urlparse(mod_link)
+    if 'update' in parse_qs(parsed_url.query):
+        parsed_url = parsed_url._replace(query='')  # Remove all query parameters
+        mod_link = urlunparse(parsed_url)
+    return mod_link
+
 # Function to search for mods synchronously
 def search(query: str, page_number: int):
     print(f"[STEP] Starting search for '{query}' on page {page_number}")
@@ -94,6 +108,14 @@ def search(query: str, page_number: int):
     posts = soup.find_all("li", class_="searchResult resourceUpdate primaryContent")
     print(f"[STEP] Found {len(posts)} posts in search results.")
 
+    # Fetch every mod page of this result page concurrently, the loop below then hits the cache
+    prefetch = []
+    for post in posts:
+        mod_link = mod_link_from_post(post)
+        if mod_link:
+            prefetch.append((get_metadata_from_mod_page, mod_link))
+    transport.prefetch(prefetch)
+
     for post in posts:
         icon_src = mod_link = download_link = title = version = description = author = "N/A"
         print(f"[STEP] Processing post...")
@@ -125,20 +147,8 @@ def search(query: str, page_number: int):
                 title = title_tag.get_text(strip=True)
                 print(f"[SUCCESS] Found title: {title}")
 
-                mod_link_href = title_tag["href"]
-                mod_link = f"https://www.beamng.com/{mod_link_href}"
-
-                # Check if the URL contains an update query parameter
-                parsed_url = urlparse(mod_link)
-                query_params = parse_qs(parsed_url.query)
-
-                if 'update' in query_params:
-                    # If there is an 'update' query, remove it
-                    parsed_url = parsed_url._replace(query='')  # Remove all query parameters
-                    mod_link = urlunparse(parsed_url)
-                    print(f"[SUCCESS] Found mod link (update removed): {mod_link}")
-                else:
-                    print(f"[SUCCESS] Found mod link: {mod_link}")
+                mod_link = mod_link_from_post(post) or "N/A"
+                print(f"[SUCCESS] Found mod link: {mod_link}")
 
 
             if version_tag:
@@ -164,7 +174,11 @@ def search(query: str, page_number: int):
         # Fetch metadata if mod link is valid
         if mod_link != "N/A":
             print(f"[STEP] Fetching metadata for mod link: {mod_link}")
-            metadata = get_metadata_from_mod_page(mod_link)
+            try:
+                metadata = get_metadata_from_mod_page(mod_link)
+            except requests.RequestException:
+                print(f"[ERROR] Skipping metadata fetch for {mod_link} due to failed page fetch.")
+                metadata = ["N/A"] * 5
             download_link, number_of_downloads, rating, number_of_ratings, last_update = metadata
         else:
             print(f"[ERROR] Skipping mod {title} because the link is invalid: {mod_link}")
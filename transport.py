@@ -0,0 +1,88 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from dotenv import load_dotenv
+
+load_dotenv()
+CONNECT_TIMEOUT = float(os.environ.get("SCRAPER_CONNECT_TIMEOUT", 5))
+READ_TIMEOUT = float(os.environ.get("SCRAPER_READ_TIMEOUT", 30))
+
+# Number of threads used to fetch mod and history pages concurrently, 0 disables it
+WORKERS = int(os.environ.get("SCRAPER_WORKERS", 8))
+
+# Keep enough pooled connections for every worker plus the listing page fetch
+POOL_SIZE = max(WORKERS, 1) + 2
+
+# requests already sends keep-alive and gzip/deflate, plus br when brotli is installed
+HEADERS = {"User-Agent": "Mozilla/5.0"}
+
+_session = None
+_executor = None
+_lock = threading.Lock()
+
+
+def get_session():
+    """Return the shared keep-alive session, creating it on first use."""
+    global _session
+
+    with _lock:
+        if _session is None:
+            retries = Retry(total=2, backoff_factor=0.5, status_forcelist=(502, 503, 504), allowed_methods=("GET",))
+            adapter = HTTPAdapter(pool_connections=2, pool_maxsize=POOL_SIZE, max_retries=retries)
+
+            _session = requests.Session()
+            _session.headers.update(HEADERS)
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+        return _session
+
+
+def get(url):
+    """GET a URL through the shared session with connect and read timeouts."""
+    return get_session().get(url, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT))
+
+
+def fetch_all(calls):
+    """Run (function, argument) pairs on the thread pool and return their results in order.
+
+    A call that raised gives back its exception in place of a result. The calls
+    run one by one when WORKERS is 0.
+    """
+    global _executor
+
+    # Duplicates would race each other and fetch the same page twice
+    unique = list(dict.fromkeys(calls))
+    if WORKERS <= 0:
+        futures = None
+    else:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="fetch")
+        futures = [_executor.submit(function, argument) for function, argument in unique]
+
+    results = {}
+    for index, (function, argument) in enumerate(unique):
+        try:
+            results[(function, argument)] = futures[index].result() if futures else function(argument)
+        except Exception as e:
+            results[(function, argument)] = e
+    return [results[call] for call in calls]
+
+
+def prefetch(calls):
+    """Run (function, argument) pairs on the thread pool and wait for all of them.
+
+    Used to warm the lru_caches of page fetchers so the synchronous code that
+    follows gets cache hits, which only holds while the calls fit in those
+    caches. Does nothing when WORKERS is 0.
+    """
+    if WORKERS <= 0 or not calls:
+        return
+
+    for result in fetch_all(calls):
+        if isinstance(result, Exception):
+            # Failed fetches raise instead of being cached, so the synchronous call retries and reports it
+            print(f"[ERROR] Prefetch failed: {result}")